@@ -12,27 +12,41 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import os
+
 import collectd
 
 path = "/proc/uptime"
+# Keep the file open between reads to avoid an open()/close() on every interval:
+fd = os.open(path, os.O_RDONLY)
+
+# Reused for every dispatch. The values are passed to dispatch() so the template is never mutated,
+# and since its time is left unset collectd stamps each dispatch with the current time:
+val = collectd.Values(type="uptime", plugin="myuptime")
 
 
 def config_fn(config) -> None:  # pyright: ignore[reportArgumentType]
     for node in config.children:
         key = node.key.lower()
         if key == "path":
-            global path
-            path = node.values[0]
+            global path, fd
+            if node.values[0] != path:
+                os.close(fd)
+                path = node.values[0]
+                fd = os.open(path, os.O_RDONLY)
         else:
             collectd.info('sampleplugin: unrecognised option "%s"' % (key))
 
 
 def read_fn() -> None:
-    with open(path, "rb") as f:
-        uptime = float(f.readline().split()[0])
+    # /proc files are generated on read, so reading from offset 0 always yields the current value:
+    buf = os.pread(fd, 64, 0)
+    try:
+        uptime = float(buf[: buf.index(b" ")])
+    except ValueError:
+        # Not space-separated (e.g. a custom path), fall back to splitting on any whitespace:
+        uptime = float(buf.split(None, 1)[0])
 
-    val = collectd.Values(type="uptime")
-    val.plugin = "myuptime"
     val.dispatch(values=[uptime])
 
 
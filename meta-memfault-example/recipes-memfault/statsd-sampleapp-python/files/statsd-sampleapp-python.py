@@ -14,15 +14,95 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import contextlib
 import time
-from random import random
+from random import random, randrange
 
 from statsd import StatsClient
 
-statsd = StatsClient(host="localhost", port=8125, prefix="mypythonapp", maxudpsize=512, ipv6=False)
+FLUSH_INTERVAL_SECONDS = 1.0
+
+
+class ConnectedStatsClient(StatsClient):
+    """
+    StatsClient with a connected UDP socket: the destination is set once and every packet is sent
+    with send() instead of sendto().
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        prefix: str | None = None,
+        maxudpsize: int = 512,
+        ipv6: bool = False,
+    ) -> None:
+        super().__init__(host=host, port=port, prefix=prefix, maxudpsize=maxudpsize, ipv6=ipv6)
+        self._sock.connect(self._addr)
+
+    def _send(self, data: str) -> None:
+        # Like StatsClient, drop the packet (e.g. ECONNREFUSED while collectd is not running):
+        with contextlib.suppress(OSError, RuntimeError):
+            self._sock.send(data.encode("ascii"))
+
+
+class Aggregator:
+    """
+    Pre-aggregates counters and gauges and buffers timings, sending them all in one batch at most
+    once per flush interval.
+    """
+
+    def __init__(self, client: StatsClient, flush_interval_seconds: float) -> None:
+        self.client = client
+        self.flush_interval_seconds = flush_interval_seconds
+        self.counts: dict[str, float] = {}
+        self.gauges: dict[str, float] = {}
+        # Timings are kept individually, collectd computes their distribution:
+        self.timings: dict[str, list[float]] = {}
+        self._next_flush = time.monotonic() + flush_interval_seconds
+
+    def incr(self, name: str, value: float) -> None:
+        self.counts[name] = self.counts.get(name, 0) + value
+        self._flush_if_due()
+
+    def gauge(self, name: str, value: float) -> None:
+        self.gauges[name] = value
+        self._flush_if_due()
+
+    def timing(self, name: str, value_ms: float) -> None:
+        self.timings.setdefault(name, []).append(value_ms)
+        self._flush_if_due()
+
+    def flush(self) -> None:
+        with self.client.pipeline() as pipe:
+            for name, value in self.counts.items():
+                pipe.incr(name, value)
+            for name, value in self.gauges.items():
+                pipe.gauge(name, value)
+            for name, values in self.timings.items():
+                for value in values:
+                    pipe.timing(name, value)
+        # Counters restart from zero, gauges keep their last value:
+        self.counts.clear()
+        self.timings.clear()
+
+    def _flush_if_due(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_flush:
+            self.flush()
+            self._next_flush = now + self.flush_interval_seconds
+
+
+# collectd's statsd plugin only listens on UDP. Datagrams sent over the loopback interface are not
+# bound by the network MTU though, so allow batches up to the 4096 bytes the plugin reads at once.
+statsd = ConnectedStatsClient(
+    host="localhost", port=8125, prefix="mypythonapp", maxudpsize=4096, ipv6=False
+)
+aggregator = Aggregator(statsd, FLUSH_INTERVAL_SECONDS)
 
 while True:
-    statsd.incr("mycount", int(3 * random()))  # noqa: S311
-    statsd.gauge("mygauge", int(100 * random()))  # noqa: S311
-    with statsd.timer("mytime"):
-        time.sleep(2 * random())  # noqa: S311
+    aggregator.incr("mycount", randrange(3))  # noqa: S311
+    aggregator.gauge("mygauge", randrange(100))  # noqa: S311
+    start_ns = time.monotonic_ns()
+    time.sleep(2 * random())  # noqa: S311
+    aggregator.timing("mytime", (time.monotonic_ns() - start_ns) // 1_000_000)
@@ -6,7 +6,7 @@ import os
 import pathlib
 import textwrap
 import uuid
-from collections.abc import Iterable
+from collections.abc import Callable, Iterable
 
 import pytest
 
@@ -22,6 +22,11 @@ pytest.register_assert_rewrite(
 from .memfault_service_tester import MemfaultServiceTester  # noqa: E402
 from .qemu import QEMU  # noqa: E402
 
+# Image configuration used when a test does not override the fixtures below. Shared with
+# qemu_readonly, which cannot depend on the function-scoped fixtures.
+DEFAULT_MEMFAULT_EXTRA_CONFIG = {"enable_data_collection": True}
+DEFAULT_SWUPDATE_ENABLED = False
+
 
 @pytest.fixture()
 def qemu_device_id() -> str:
@@ -31,9 +36,13 @@ def qemu_device_id() -> str:
     return device_id
 
 
+def get_hardware_version() -> str:
+    return os.environ.get("MEMFAULT_HARDWARE_VERSION", "qemuarm64")
+
+
 @pytest.fixture()
 def qemu_hardware_version() -> str:
-    return os.environ.get("MEMFAULT_HARDWARE_VERSION", "qemuarm64")
+    return get_hardware_version()
 
 
 @pytest.fixture(autouse=True)
@@ -48,14 +57,9 @@ def _set_test_id_device_attribute(request: pytest.FixtureRequest) -> Iterable[No
         return
 
     memfault_service_tester, qemu_device_id = (request.getfixturevalue(f) for f in fixture_names)
+    key = request.getfixturevalue("_test_id_custom_metric")
     yield
     # Patch the device attributes after the test has run, because the patch endpoint requires the device to exist.
-    key = "test_id"
-    try:  # noqa: SIM105
-        memfault_service_tester.create_custom_metric(key=key, data_type="STRING")
-    except AssertionError:
-        pass  # Ignore 409 Conflict errors, which indicate the metric already exists.
-
     try:  # noqa: SIM105
         memfault_service_tester.patch_device_attributes(
             device_serial=qemu_device_id,
@@ -65,17 +69,34 @@ def _set_test_id_device_attribute(request: pytest.FixtureRequest) -> Iterable[No
         pass  # Ignore 404 errors - the test might not be creating the device.
 
 
+@pytest.fixture(scope="session")
+def _test_id_custom_metric(memfault_service_tester: MemfaultServiceTester) -> str:
+    """Create the "test_id" custom metric once per session, rather than after every test."""
+    key = "test_id"
+    try:  # noqa: SIM105
+        memfault_service_tester.create_custom_metric(key=key, data_type="STRING")
+    except AssertionError:
+        pass  # Ignore 409 Conflict errors, which indicate the metric already exists.
+    return key
+
+
 @pytest.fixture()
 def memfault_device_info(
     tmpdir: pathlib.Path, qemu_device_id: str, qemu_hardware_version: str
+) -> pathlib.Path:
+    return write_memfault_device_info(tmpdir, qemu_device_id, qemu_hardware_version)
+
+
+def write_memfault_device_info(
+    tmpdir: pathlib.Path, device_id: str, hardware_version: str
 ) -> pathlib.Path:
     fn = tmpdir / "memfault-device-info"
     with open(fn, "w") as f:
         f.write(
             textwrap.dedent(f"""\
                 #!/bin/sh
-                echo MEMFAULT_DEVICE_ID={qemu_device_id}
-                echo MEMFAULT_HARDWARE_VERSION={qemu_hardware_version}
+                echo MEMFAULT_DEVICE_ID={device_id}
+                echo MEMFAULT_HARDWARE_VERSION={hardware_version}
                 """)
         )
     os.chmod(fn, 0o755)  # noqa: S103
@@ -90,7 +111,28 @@ def memfault_extra_config(data_collection_enabled: bool) -> object:
     if not data_collection_enabled:
         return {}
     else:
-        return {"enable_data_collection": True}
+        return dict(DEFAULT_MEMFAULT_EXTRA_CONFIG)
+
+
+@pytest.fixture(scope="session")
+def base_qemu_image(
+    tmp_path_factory: pytest.TempPathFactory,
+) -> Callable[[object, bool], pathlib.Path]:
+    """
+    Returns a function that provides an image with the given extra config and swupdate setting applied.
+    Most tests use the same settings, so the images are only built once per session.
+    """
+    cache: dict[str, pathlib.Path] = {}
+
+    def _get(memfault_extra_config: object, swupdate_enabled: bool) -> pathlib.Path:
+        key = json.dumps([memfault_extra_config, swupdate_enabled], sort_keys=True)
+        if key not in cache:
+            cache[key] = build_base_qemu_image(
+                tmp_path_factory.mktemp("base_image"), memfault_extra_config, swupdate_enabled
+            )
+        return cache[key]
+
+    return _get
 
 
 @pytest.fixture()
@@ -99,14 +141,24 @@ def qemu_image_wic_path(
     memfault_device_info: pathlib.Path,
     memfault_extra_config: object,
     swupdate_enabled: bool,
+    base_qemu_image: Callable[[object, bool], pathlib.Path],
 ) -> pathlib.Path:
-    dest_wic = tmpdir / "ci-test-image.copy.wic"
+    return build_qemu_image(
+        tmpdir, memfault_device_info, base_qemu_image(memfault_extra_config, swupdate_enabled)
+    )
+
+
+def build_base_qemu_image(
+    tmpdir: pathlib.Path,
+    memfault_extra_config: object,
+    swupdate_enabled: bool,
+) -> pathlib.Path:
+    dest_wic = tmpdir / "ci-test-image.base.wic"
     image = WicImage(
         runqemu.qemu_get_image_wic_path(CI_IMAGE_FILENAME),
         dest_wic,
         runqemu.qemu_get_system_partition_a_index(),
     )
-    install_memfault_device_info(image, memfault_device_info)
     install_extra_config(tmpdir, image, memfault_extra_config)
 
     if swupdate_enabled is False:
@@ -115,6 +167,17 @@ def qemu_image_wic_path(
     return dest_wic
 
 
+def build_qemu_image(
+    tmpdir: pathlib.Path,
+    memfault_device_info: pathlib.Path,
+    base_wic: pathlib.Path,
+) -> pathlib.Path:
+    dest_wic = tmpdir / "ci-test-image.copy.wic"
+    image = WicImage(base_wic, dest_wic, runqemu.qemu_get_system_partition_a_index())
+    install_memfault_device_info(image, memfault_device_info)
+    return dest_wic
+
+
 def install_memfault_device_info(qemu_image: WicImage, memfault_device_info: pathlib.Path) -> None:
     qemu_image.rm("/usr/bin/memfault-device-info")
     qemu_image.add_file(memfault_device_info, "/usr/bin/")
@@ -123,6 +186,9 @@ def install_memfault_device_info(qemu_image: WicImage, memfault_device_info: pat
 def install_extra_config(
     tmpdir: pathlib.Path, qemu_image: WicImage, memfault_extra_config: object
 ) -> None:
+    if not memfault_extra_config:
+        return
+
     config = tmpdir / "memfaultd.conf"
     config_file = "/etc/memfaultd.conf"
     qemu_image.extract_file(config_file, config)
@@ -149,9 +215,33 @@ def qemu(qemu_image_wic_path: pathlib.Path) -> QEMU:
     return QEMU(qemu_image_wic_path)
 
 
+@pytest.fixture(scope="session")
+def qemu_readonly(
+    tmp_path_factory: pytest.TempPathFactory,
+    base_qemu_image: Callable[[object, bool], pathlib.Path],
+) -> QEMU:
+    """
+    A QEMU instance that is booted once and shared by all tests that only run read-only commands and
+    do not need their own device.
+    """
+    tmpdir = tmp_path_factory.mktemp("qemu_readonly")
+    memfault_device_info = write_memfault_device_info(
+        tmpdir, str(uuid.uuid4()), get_hardware_version()
+    )
+    qemu = QEMU(
+        build_qemu_image(
+            tmpdir,
+            memfault_device_info,
+            base_qemu_image(DEFAULT_MEMFAULT_EXTRA_CONFIG, DEFAULT_SWUPDATE_ENABLED),
+        )
+    )
+    qemu.wait_for_memfaultd_start()
+    return qemu
+
+
 @pytest.fixture()
 def swupdate_enabled() -> bool:
-    return False
+    return DEFAULT_SWUPDATE_ENABLED
 
 
 @pytest.fixture()
@@ -159,7 +249,7 @@ def data_collection_enabled() -> bool:
     return True
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def memfault_service_tester() -> MemfaultServiceTester:
     return MemfaultServiceTester(
         base_url=os.environ["MEMFAULT_E2E_API_BASE_URL"],
@@ -175,6 +265,7 @@ def wait_for_memfaultd_start() -> bool:
 
 
 @pytest.fixture(autouse=True)
-def _do_wait_for_memfaultd(wait_for_memfaultd_start: bool, qemu: QEMU) -> None:
-    if wait_for_memfaultd_start:
-        qemu.wait_for_memfaultd_start()
+def _do_wait_for_memfaultd(request: pytest.FixtureRequest, wait_for_memfaultd_start: bool) -> None:
+    # Only boot a per-test QEMU for tests that use one (and not for those using qemu_readonly):
+    if wait_for_memfaultd_start and "qemu" in request.fixturenames:
+        request.getfixturevalue("qemu").wait_for_memfaultd_start()
@@ -10,6 +10,8 @@ from typing import Literal, TypeAlias, TypeVar, cast
 from unittest.mock import ANY
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 Json: TypeAlias = Mapping[str, "Json"] | Sequence["Json"] | str | int | float | bool | None
 
@@ -25,37 +27,72 @@ class MemfaultServiceTester:
 
     session: requests.Session = dataclasses.field(init=False)
 
+    # The URLs are built once, rather than on every request made by the pollers:
+    _api_url: str = dataclasses.field(init=False)
+    _project_url: str = dataclasses.field(init=False)
+    _devices_url: str = dataclasses.field(init=False)
+    _reports_url: str = dataclasses.field(init=False)
+    _elf_coredumps_url: str = dataclasses.field(init=False)
+    _custom_metrics_url: str = dataclasses.field(init=False)
+
     def __post_init__(self) -> None:
         self.base_url = self.base_url.rstrip("/")
         self.session = requests.Session()
         self.session.auth = ("", self.organization_token)
+        # The tester is shared by the whole session (and by the pollers), so keep enough connections
+        # alive to avoid new TLS handshakes, and retry transient gateway errors. The final response
+        # is returned rather than raised, so that the callers' status code assertions report it:
+        self.session.mount(
+            "https://",
+            HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.2,
+                    status_forcelist=(502, 503, 504),
+                    raise_on_status=False,
+                ),
+            ),
+        )
 
-    @property
-    def _api_url(self) -> str:
-        return f"{self.base_url}/api/v0"
-
-    @property
-    def _project_url(self) -> str:
-        return (
+        self._api_url = f"{self.base_url}/api/v0"
+        self._project_url = (
             f"{self._api_url}/organizations/{self.organization_slug}/projects/{self.project_slug}"
         )
+        self._devices_url = f"{self._project_url}/devices"
+        self._reports_url = f"{self._project_url}/reports"
+        self._elf_coredumps_url = f"{self._project_url}/elf_coredumps"
+        self._custom_metrics_url = f"{self._project_url}/custom-metrics"
 
     def poll_until_not_raising(
         self,
         check_callback: Callable[[], _T],
         timeout_seconds: float = 10,
-        poll_interval_seconds: float = 0.5,
+        min_interval: float = 1.0,
+        overhead_rate: float = 0.1,
+        max_interval: float = 2.0,
+        retry_on: tuple[type[Exception], ...] = (AssertionError,),
     ) -> _T:
-        timeout = time.time() + timeout_seconds
+        """
+        Call check_callback until it does not raise. After having polled for T seconds, the next
+        attempt is made after max(min_interval, overhead_rate * T) seconds, up to max_interval. This
+        keeps the number of requests low for long waits, while bounding the time wasted after the check
+        would have passed to about overhead_rate of the total wait (or max_interval for long waits).
+        Only the exceptions in retry_on are retried, anything else is considered a real failure and
+        raised right away.
+        """
+        start = time.monotonic()
         while True:
             try:
                 rv = check_callback()
-            except Exception:
-                if time.time() > timeout:
+            except retry_on:
+                elapsed = time.monotonic() - start
+                if elapsed > timeout_seconds:
                     raise
             else:
                 return rv
-            time.sleep(poll_interval_seconds)
+            time.sleep(min(max_interval, max(min_interval, overhead_rate * elapsed)))
 
     def list_reboot_events(
         self,
@@ -67,7 +104,7 @@ class MemfaultServiceTester:
         if params is None:
             params = {}
 
-        url = f"{self._project_url}/devices/{device_serial}/reboots"
+        url = f"{self._devices_url}/{device_serial}/reboots"
         resp = self.session.get(
             url,
             params=params,  # pyright: ignore[reportArgumentType]
@@ -87,11 +124,15 @@ class MemfaultServiceTester:
                 device_serial=device_serial, params=params, expect_status=ANY
             )
             assert events is not None
-            assert len(events) >= count
+            assert len(events) >= count, f"Got: {len(events)}, Expected: {count}"
             events.sort(key=lambda x: datetime.datetime.fromisoformat(cast(str, x["time"])))
             return events
 
-        return self.poll_until_not_raising(_check, timeout_seconds=timeout_secs)
+        return self.poll_until_not_raising(
+            _check,
+            timeout_seconds=timeout_secs,
+            retry_on=(AssertionError, requests.RequestException),
+        )
 
     def list_reports(
         self,
@@ -100,7 +141,7 @@ class MemfaultServiceTester:
         ignore_errors: bool = False,
     ) -> list[dict[str, Json]]:
         rv = self.session.get(
-            f"{self._project_url}/reports",
+            self._reports_url,
             params=params,  # pyright: ignore[reportArgumentType]
         )
         assert rv.status_code == expect_status or ignore_errors
@@ -118,20 +159,16 @@ class MemfaultServiceTester:
         if device_serial:
             params = {"device_serial": device_serial, **params}
 
-        num_reports = 0
-        timeout = time.time() + timeout_secs
-        reports = []
-        while True:
-            if num_reports >= count or time.time() > timeout:
-                assert num_reports >= count, f"Got: {num_reports}, Expected: {count}"
-                break
-            reports = self.list_reports(
-                params,
-                ignore_errors=True,
-            )
-            num_reports = len(reports)
-            time.sleep(0.5)
-        return reports
+        def _check() -> list[dict[str, Json]]:
+            reports = self.list_reports(params, ignore_errors=True)
+            assert len(reports) >= count, f"Got: {len(reports)}, Expected: {count}"
+            return reports
+
+        return self.poll_until_not_raising(
+            _check,
+            timeout_seconds=timeout_secs,
+            retry_on=(AssertionError, requests.RequestException),
+        )
 
     def list_elf_coredumps(
         self,
@@ -140,7 +177,7 @@ class MemfaultServiceTester:
         ignore_errors: bool = False,
     ) -> list[dict[str, Json]]:
         rv = self.session.get(
-            f"{self._project_url}/elf_coredumps",
+            self._elf_coredumps_url,
             params=params,  # pyright: ignore[reportArgumentType]
         )
         assert rv.status_code == expect_status or ignore_errors
@@ -160,10 +197,14 @@ class MemfaultServiceTester:
 
         def _check() -> list[dict[str, Json]]:
             elf_coredumps = self.list_elf_coredumps(params=params, expect_status=ANY)
-            assert len(elf_coredumps) >= count
+            assert len(elf_coredumps) >= count, f"Got: {len(elf_coredumps)}, Expected: {count}"
             return elf_coredumps
 
-        return self.poll_until_not_raising(_check, timeout_seconds=timeout_secs)
+        return self.poll_until_not_raising(
+            _check,
+            timeout_seconds=timeout_secs,
+            retry_on=(AssertionError, requests.RequestException),
+        )
 
     def list_attributes(
         self,
@@ -175,7 +216,7 @@ class MemfaultServiceTester:
         if params is None:
             params = {}
 
-        url = f"{self._project_url}/devices/{device_serial}/attributes"
+        url = f"{self._devices_url}/{device_serial}/attributes"
         resp = self.session.get(
             url,
             params=params,  # pyright: ignore[reportArgumentType]
@@ -190,7 +231,7 @@ class MemfaultServiceTester:
         patch: dict[str, bool | int | float | str],
         expect_status: int = 204,
     ) -> None:
-        url = f"{self._project_url}/devices/{device_serial}/attributes"
+        url = f"{self._devices_url}/{device_serial}/attributes"
         resp = self.session.patch(
             url, json=[{"string_key": k, "value": v} for k, v in patch.items()]
         )
@@ -203,9 +244,8 @@ class MemfaultServiceTester:
         data_type: Literal["INT", "FLOAT", "STRING", "BOOL"],
         expect_status: int = 200,
     ) -> dict[str, Json] | None:
-        url = f"{self._project_url}/custom-metrics"
         resp = self.session.post(
-            url,
+            self._custom_metrics_url,
             json={
                 "string_key": key,
                 "data_type": data_type,
@@ -218,20 +258,18 @@ class MemfaultServiceTester:
         self, device_serial: str, params: dict[str, Json] | None = None
     ) -> list[dict[str, Json]]:
         rv = self.session.get(
-            f"{self._project_url}/devices/{device_serial}/log-files",
+            f"{self._devices_url}/{device_serial}/log-files",
             params=params,  # pyright: ignore[reportArgumentType]
         )
         assert rv.status_code == 200
         return cast(list[dict[str, Json]], rv.json()["data"])
 
     def log_file_download(self, device_serial: str, cid: str | uuid.UUID) -> str:
-        rv = self.session.get(
-            f"{self._project_url}/devices/{device_serial}/log-files/{cid}/download"
-        )
+        rv = self.session.get(f"{self._devices_url}/{device_serial}/log-files/{cid}/download")
         assert rv.status_code == 200
         return rv.text
 
     def get_device(self, device_serial: str) -> dict[str, Json]:
-        rv = self.session.get(f"{self._project_url}/devices/{device_serial}")
+        rv = self.session.get(f"{self._devices_url}/{device_serial}")
         assert rv.status_code == 200, f"Get device failed with status: {rv.status_code}"
         return cast(dict[str, Json], rv.json()["data"])
@@ -1,10 +1,13 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
+import itertools
+import math
 import os
+import re
 import sys
-import time
-from typing import Literal, cast
+from collections.abc import Iterable
+from typing import BinaryIO, Literal
 
 import pexpect
 
@@ -20,16 +23,51 @@ SystemdState = Literal[
     "maintenance",
 ]
 
+# pexpect compiles string patterns on every expect() call, compile the common ones only once:
+_LOGIN_PATTERN = re.compile(rb" login:")
+_PROMPT_PATTERN = re.compile(rb"#")
+_NEWLINE_PATTERN = re.compile(rb"\n")
+# Does not match the echoed command itself, where "service-state=" is followed by "$(":
+_SYSTEMD_STATE_PATTERN = re.compile(rb"service-state=([a-z]+)")
+# Does not match the echoed command itself, where "restart-jobs=" is followed by "$(":
+_RESTART_JOBS_PATTERN = re.compile(rb"restart-jobs=(\d+)\r\n")
+_MEMFAULTD_JOURNAL_PATH = "/tmp/memfaultd.journal"
+
+_SYSTEMD_POLL_INTERVAL_SECONDS = 0.1
+
+
+def _open_console_log() -> BinaryIO | None:
+    """
+    The QEMU console output is logged to stdout by default, which pytest captures and shows for failing
+    tests. Set QEMU_LOG to a file path to log it there instead, or to /dev/null to not log it at all.
+    """
+    path = os.environ.get("QEMU_LOG")
+    if path is None:
+        return None
+    return open(path, "ab")
+
 
 class QEMU:
     def __init__(self, image_wic_path: os.PathLike[str]) -> None:
         command, *args = runqemu.qemu_build_command(image_wic_path)
-        self.pid = pexpect.spawn(command, args, timeout=120, logfile=sys.stdout.buffer)
+        self._console_log = _open_console_log()
+        self._exit_sentinel_ids = itertools.count()
+        self.pid = pexpect.spawn(
+            command,
+            args,
+            timeout=120,
+            logfile=self._console_log or sys.stdout.buffer,
+            # Only search newly received data plus this many preceding bytes, instead of rescanning
+            # the whole buffer on every read (e.g. while long journalctl output is streamed in):
+            searchwindowsize=4096,
+        )
         self.login()
 
     def __del__(self) -> None:
         self.pid.close()
         self.pid.wait()
+        if self._console_log:
+            self._console_log.close()
 
     def _set_env(self) -> None:
         # Setting this environment variable to an empty string or the value "cat" is equivalent to passing --no-pager.
@@ -39,7 +77,7 @@ class QEMU:
         self.exec_cmd("export SYSTEMD_PAGER=cat")
 
     def login(self) -> None:
-        self.pid.expect(" login:")
+        self.pid.expect(_LOGIN_PATTERN)
         self.pid.sendline("root")
         self._set_env()
 
@@ -48,9 +86,34 @@ class QEMU:
 
     def exec_cmd(self, cmd: str) -> None:
         self.pid.sendline("")
-        self.pid.expect("#")
+        self.pid.expect(_PROMPT_PATTERN)
         self.pid.sendline(cmd)
-        self.pid.expect("\n")
+        self.pid.expect(_NEWLINE_PATTERN)
+
+    def exec_cmd_and_wait(
+        self, cmd: str, pattern: re.Pattern[bytes], timeout: int = 10
+    ) -> re.Match[bytes]:
+        """
+        Run a command and wait for `pattern` on the console. Fails as soon as the command exits without
+        `pattern` having shown up, instead of waiting for the whole timeout.
+
+        Note that `pattern` is also matched against the prompt and the echoed command line, which can
+        still be in the buffer. Have the command print a label (e.g. `echo size=$(...)`) and include it
+        in `pattern`, so that only the command's output can match.
+        """
+        # The sentinel is unique per command, so that a late sentinel of an earlier command can never
+        # be mistaken for this one. The echoed command line contains "$?" instead of digits, so it does
+        # not match either:
+        sentinel_id = next(self._exit_sentinel_ids)
+        exit_sentinel_pattern = re.compile(rb"__MF_EXIT_%d_(\d+)__" % sentinel_id)
+        self.exec_cmd(f"{cmd}; echo __MF_EXIT_{sentinel_id}_$?__")
+        index = self.pid.expect([pattern, exit_sentinel_pattern], timeout=timeout)
+        match = self.pid.match
+        assert isinstance(match, re.Match)
+        assert index == 0, (
+            f"{cmd!r} exited with status {int(match.group(1))} before printing {pattern!r}"
+        )
+        return match
 
     def systemd_wait_for_service_state(
         self,
@@ -59,37 +122,55 @@ class QEMU:
         *,
         timeout_seconds: float = 10.0,
     ) -> None:
-        states: list[SystemdState] = [
-            "inactive",
-            "active",
-            "deactivating",
-            "activating",
-            "reloading",
-            "failed",
-            "maintenance",
-        ]
-        expected_state_idx = states.index(expected_state)
-        timeout = time.time() + timeout_seconds
-        last_state_idx = -1
-        while time.time() < timeout:
-            self.exec_cmd(f"systemctl is-active {service}")
-            last_state_idx = self.child().expect(states)
-            if last_state_idx == expected_state_idx:
-                return
-            time.sleep(0.1)
-        raise TimeoutError(
-            f"Timed out waiting for service {service} to get state {expected_state}. Last state: {states[last_state_idx]}"
+        # Poll on the guest rather than from here, so that waiting only takes a single round-trip over
+        # the serial console instead of one per attempt. The loop is bounded by the guest's clock rather
+        # than by a number of attempts, because each systemctl call can be slow under emulation:
+        timeout_whole_seconds = math.ceil(timeout_seconds)
+        self.exec_cmd(
+            f"end=$(($(date +%s) + {timeout_whole_seconds}));"
+            f' until [ "$(systemctl is-active {service})" = {expected_state} ]'
+            f" || [ $(date +%s) -ge $end ]; do sleep {_SYSTEMD_POLL_INTERVAL_SECONDS}; done;"
+            f" echo service-state=$(systemctl is-active {service})"
         )
+        # Leave some slack for the final systemctl call and the round-trip:
+        self.child().expect(_SYSTEMD_STATE_PATTERN, timeout=timeout_whole_seconds + 30)
+        match = self.child().match
+        assert isinstance(match, re.Match)
+        last_state = match.group(1).decode()
+        if last_state != expected_state:
+            raise TimeoutError(
+                f"Timed out waiting for service {service} to get state {expected_state}. Last state: {last_state}"
+            )
 
     def expect_journald_message(
-        self, unit: str, message: str, timeout: float = 3, last_lines: int = 0
+        self, unit: str, message: str, timeout: int = 3, last_lines: int = 0
     ) -> None:
         """Wait for a specific message from a journald unit."""
         self.exec_cmd(f'(journalctl -f -u {unit} -n {last_lines} &) |grep -q "{message}"')
-        self.pid.expect("#", timeout=cast(int, timeout))
+        self.pid.expect(_PROMPT_PATTERN, timeout=timeout)
 
     def wait_for_memfaultd_start(self, timeout: float = 3) -> None:
         """Wait for memfaultd to start - Note that this will return immediately if memfaultd was just started."""
-        self.expect_journald_message(
-            "memfaultd", "Started memfaultd daemon", last_lines=10, timeout=timeout
+        # memfaultd.service only becomes active once memfaultd has written its PID file, which is when
+        # systemd logs "Started memfaultd daemon":
+        self.systemd_wait_for_service_state("memfaultd.service", "active", timeout_seconds=timeout)
+
+    def assert_memfaultd_not_restarted_on_failure(
+        self, journal_messages: Iterable[bytes] = ()
+    ) -> None:
+        """
+        Assert that systemd never had to restart memfaultd.service because it failed, after expecting
+        `journal_messages`, in order, in the memfaultd.service journal.
+        """
+        # Count the restart jobs in the same journalctl run that is streamed to the console:
+        self.exec_cmd(
+            f"journalctl -u memfaultd.service | tee {_MEMFAULTD_JOURNAL_PATH};"
+            f' echo restart-jobs=$(grep -c "memfaultd.service: Scheduled restart job"'
+            f" {_MEMFAULTD_JOURNAL_PATH})"
         )
+        for message in journal_messages:
+            self.child().expect_exact(message)
+        self.child().expect(_RESTART_JOBS_PATTERN)
+        match = self.child().match
+        assert isinstance(match, re.Match)
+        assert int(match.group(1)) == 0, "memfaultd.service failed and was restarted"
@@ -3,35 +3,34 @@
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
 import dataclasses
+import functools
 import os
 import pathlib
 import platform
-import shlex
 
 
-def get_build_dir() -> pathlib.Path:
-    bitbake_path = os.getenv("BUILDDIR")
-    assert bitbake_path, "Missing BUILDDIR environment variable"
-    return pathlib.Path(bitbake_path)
+def _get_required_env(name: str) -> str:
+    value = os.getenv(name)
+    assert value, f"Missing {name} environment variable"
+    return value
 
 
-def get_machine() -> str:
-    machine = os.getenv("MACHINE")
-    assert machine, "Missing MACHINE environment variable"
-    return machine
+# The build environment does not change while the tests run, so only look it up once:
+_BUILD_DIR = pathlib.Path(_get_required_env("BUILDDIR"))
+_MACHINE = _get_required_env("MACHINE")
 
 
 def get_host_arch() -> str:
     return platform.machine()
 
 
-BASE_IMAGE_FILENAME = f"base-image-{get_machine()}.wic"
+BASE_IMAGE_FILENAME = f"base-image-{_MACHINE}.wic"
 
 SYSTEM_PARTITION_A_INDEX = 2
 
 
 def qemu_get_image_wic_path(filename: str) -> pathlib.Path:
-    return get_build_dir() / "tmp" / "deploy" / "images" / get_machine() / filename
+    return _BUILD_DIR / "tmp" / "deploy" / "images" / _MACHINE / filename
 
 
 def qemu_get_system_partition_a_index() -> int:
@@ -50,44 +49,55 @@ class QemuInfo:
 def qemu_build_command(
     image_wic_path: os.PathLike[str] = _DEFAULT_IMAGE_WIC_PATH,
 ) -> list[str]:
+    args_before_drive, args_after_drive = _qemu_build_base_command()
+    return [
+        *args_before_drive,
+        "-drive",
+        f"id=disk0,file={os.fspath(image_wic_path)},if=none,format=raw",
+        "-device",
+        "virtio-blk-device,drive=disk0",
+        *args_after_drive,
+    ]
+
+
+@functools.cache
+def _qemu_build_base_command() -> tuple[tuple[str, ...], tuple[str, ...]]:
+    """
+    The parts of the QEMU command line that do not depend on the disk image, split at the point where
+    the disk arguments go.
+    """
     machine_to_qemu_info: dict[str, QemuInfo] = {
         "qemuarm": QemuInfo(executable_name="qemu-system-arm", cpu_name="cortex-a15"),
         "qemuarm64": QemuInfo(executable_name="qemu-system-aarch64", cpu_name="cortex-a57"),
     }
 
-    bitbake_path = get_build_dir()
-    machine = get_machine()
-    qemu_info = machine_to_qemu_info[machine]
-
-    build_output_path = bitbake_path / "tmp/deploy/images" / machine
-
-    command_parts: list[str | pathlib.Path] = []
-    command_parts.append(
-        bitbake_path
-        / "tmp/work"
-        / f"{get_host_arch()}-linux"
-        / "qemu-helper-native/1.0-r1/recipe-sysroot-native/usr/bin"
-        / qemu_info.executable_name
-    )
-    command_parts.append(
-        "-device virtio-net-pci,netdev=net0,mac=52:54:00:12:35:02 -netdev user,id=net0"
+    qemu_info = machine_to_qemu_info[_MACHINE]
+
+    build_output_path = _BUILD_DIR / "tmp/deploy/images" / _MACHINE
+
+    args_before_drive = (
+        os.fspath(
+            _BUILD_DIR
+            / "tmp/work"
+            / f"{get_host_arch()}-linux"
+            / "qemu-helper-native/1.0-r1/recipe-sysroot-native/usr/bin"
+            / qemu_info.executable_name
+        ),
+        *("-device", "virtio-net-pci,netdev=net0,mac=52:54:00:12:35:02"),
+        *("-netdev", "user,id=net0"),
+        *("-object", "rng-random,filename=/dev/urandom,id=rng0"),
+        *("-device", "virtio-rng-pci,rng=rng0"),
     )
-    command_parts.append(
-        "-object rng-random,filename=/dev/urandom,id=rng0 -device virtio-rng-pci,rng=rng0"
+    args_after_drive = (
+        *("-device", "qemu-xhci", "-device", "usb-tablet", "-device", "usb-kbd"),
+        *("-device", "virtio-gpu-pci", "-nographic"),
+        *("-machine", "virt", "-cpu", qemu_info.cpu_name, "-smp", "4", "-m", "512M"),
+        *("-serial", "mon:stdio", "-serial", "null"),
+        *("-bios", os.fspath(build_output_path / "u-boot.bin")),
     )
-    command_parts.append(
-        f"-drive id=disk0,file={image_wic_path},if=none,format=raw -device virtio-blk-device,drive=disk0"
-    )
-    command_parts.append(
-        "-device qemu-xhci -device usb-tablet -device usb-kbd -device virtio-gpu-pci -nographic"
-    )
-    command_parts.append(f"-machine virt -cpu {qemu_info.cpu_name} -smp 4 -m 512M")
-    command_parts.append("-serial mon:stdio -serial null")
-    command_parts.append("-bios " + str(build_output_path / "u-boot.bin"))
-
-    return shlex.split(" ".join(str(part) for part in command_parts))
+    return args_before_drive, args_after_drive
 
 
 if __name__ == "__main__":
-    executable, *args = qemu_build_command()
-    os.execv(executable, [executable, *args])  # noqa: S606
+    argv = qemu_build_command()
+    os.execvp(argv[0], argv)  # noqa: S606
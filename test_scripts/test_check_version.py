@@ -5,21 +5,25 @@ import re
 
 from .qemu import QEMU
 
+_VERSION_PATTERN = re.compile(rb"VERSION=\d+\.\d+\.\d+.*\n")
+_GIT_COMMIT_PATTERN = re.compile(rb"GIT COMMIT=[0-9a-f]+\s*\n")
+_BUILD_ID_PATTERN = re.compile(rb"BUILD ID=[0-9]+\s*\n")
+
 
 # Note: this test will normally fail in development because there is no VERSION
 # file in the dev repo It will work in CI because we use the prepare-sdk script
 # to build the environment, including a VERSION file.
-def test_version(qemu: QEMU) -> None:
+def test_version(qemu_readonly: QEMU) -> None:
     for cmd in [
         "memfaultctl --version",
         "memfaultctl -v",
         "memfaultd --version",
         "memfaultd -v",
     ]:
-        qemu.exec_cmd(cmd)
+        qemu_readonly.exec_cmd(cmd)
         # Note: "dev" should fail the test:
-        qemu.child().expect(re.compile(rb"VERSION=\d+\.\d+\.\d+.*\n"), timeout=1)
+        qemu_readonly.child().expect(_VERSION_PATTERN, timeout=1)
         # Note: "unknown" should fail the test:
-        qemu.child().expect(re.compile(rb"GIT COMMIT=[0-9a-f]+\s*\n"), timeout=1)
+        qemu_readonly.child().expect(_GIT_COMMIT_PATTERN, timeout=1)
         # Note: "unknown" should fail the test:
-        qemu.child().expect(re.compile(rb"BUILD ID=[0-9]+\s*\n"), timeout=1)
+        qemu_readonly.child().expect(_BUILD_ID_PATTERN, timeout=1)
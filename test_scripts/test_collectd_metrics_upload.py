@@ -1,11 +1,17 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
-from time import sleep
+import math
+from time import monotonic, sleep
+
+import requests
 
 from .memfault_service_tester import MemfaultServiceTester
 from .qemu import QEMU
 
+# How often to force another sync while waiting for the metrics to show up:
+_SYNC_INTERVAL_SECONDS = 5
+
 
 # Assumptions:
 # - The machine/qemu is built with a valid project key of a project on app.memfault.com,
@@ -16,16 +22,22 @@ def test_metrics_sync(
     qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device_id: str
 ) -> None:
     # Run collectd at 1hz
-    qemu.exec_cmd("sed -ie 's/Interval .*/Interval 1/' /etc/collectd.conf")
-    qemu.exec_cmd("systemctl restart collectd")
+    qemu.exec_cmd(
+        "sed -ie 's/Interval .*/Interval 1/' /etc/collectd.conf && systemctl restart collectd"
+    )
 
     # Wait for collectd to start (it starts after memfaultd)
     qemu.systemd_wait_for_service_state("collectd.service", "active")
 
+    last_sync = -math.inf
+
     def _check() -> None:
-        # Force a sync - We do this in the _check loop so we attempt more than once
-        qemu.exec_cmd("memfaultctl sync")
-        sleep(1)
+        # Force a sync - We do this in the _check loop so we attempt more than once, but not on every
+        # attempt because the upload takes a moment anyway:
+        nonlocal last_sync
+        if monotonic() - last_sync >= _SYNC_INTERVAL_SECONDS:
+            qemu.exec_cmd("memfaultctl sync")
+            last_sync = monotonic()
 
         reports = memfault_service_tester.list_reports(
             {"device_serial": qemu_device_id},
@@ -36,14 +48,17 @@ def test_metrics_sync(
         assert any(report["metrics"] for report in reports)
 
     memfault_service_tester.poll_until_not_raising(
-        _check, timeout_seconds=60, poll_interval_seconds=1
+        _check,
+        timeout_seconds=60,
+        retry_on=(AssertionError, requests.RequestException),
     )
 
 
 def test_write_on_exit(qemu: QEMU) -> None:
     # Run collectd at 1hz
-    qemu.exec_cmd("sed -ie 's/Interval .*/Interval 1/' /etc/collectd.conf")
-    qemu.exec_cmd("systemctl restart collectd")
+    qemu.exec_cmd(
+        "sed -ie 's/Interval .*/Interval 1/' /etc/collectd.conf && systemctl restart collectd"
+    )
 
     # Wait for collectd to start (it starts after memfaultd)
     qemu.systemd_wait_for_service_state("collectd.service", "active")
@@ -56,4 +71,4 @@ def test_write_on_exit(qemu: QEMU) -> None:
 
     # Make sure a MAR entry was written
     qemu.exec_cmd("grep -l linux-metric-report /media/memfault/mar/*/*")
-    qemu.child().expect("manifest.json", timeout=3)
+    qemu.child().expect_exact(b"manifest.json", timeout=3)
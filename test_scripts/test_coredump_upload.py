@@ -18,7 +18,7 @@ from .qemu import QEMU
 def test(qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device_id: str) -> None:
     # Stream memfaultd's log and wait for memfaultd to start
     qemu.exec_cmd("journalctl --follow --unit=memfaultd.service &")
-    qemu.child().expect("Started memfaultd daemon")
+    qemu.child().expect_exact(b"Started memfaultd daemon")
 
     # Stream logs from kernel: memfault-core-handler logs to dmsg
     qemu.exec_cmd("journalctl --follow -t kernel &")
@@ -27,7 +27,7 @@ def test(qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device
     qemu.exec_cmd("memfaultctl trigger-coredump")
 
     # Wait for coredump to be captured by memfault-core-handler:
-    qemu.child().expect("Successfully captured coredump")
+    qemu.child().expect_exact(b"Successfully captured coredump")
 
     # Ensure memfaultd has transmitted the corefile
     qemu.exec_cmd("memfaultctl sync")
@@ -18,11 +18,9 @@ def test_customer_reboot_reason_user_reset(
 
     # 6 == kMfltRebootReason_ButtonReset
     # /media/last_reboot_reason is the default reboot.last_reboot_reason_file file path
-    qemu.exec_cmd("echo 6 > /media/last_reboot_reason")
-
-    qemu.exec_cmd("reboot")
-    qemu.child().expect("reboot: Restarting system")
-    qemu.child().expect(" login:")
+    qemu.exec_cmd("echo 6 > /media/last_reboot_reason && reboot")
+    qemu.child().expect_exact(b"reboot: Restarting system")
+    qemu.child().expect_exact(b" login:")
 
     events = memfault_service_tester.poll_reboot_events_until_count(
         2, device_serial=qemu_device_id, timeout_secs=60
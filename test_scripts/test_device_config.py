@@ -4,6 +4,7 @@
 import time
 
 import pytest
+import requests
 
 from .memfault_service_tester import MemfaultServiceTester
 from .qemu import QEMU
@@ -26,7 +27,9 @@ def test(qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device
         assert device["reported_config_revision"] == device["assigned_config_revision"]
 
     memfault_service_tester.poll_until_not_raising(
-        _check, timeout_seconds=60, poll_interval_seconds=1
+        _check,
+        timeout_seconds=60,
+        retry_on=(AssertionError, requests.RequestException),
     )
 
 
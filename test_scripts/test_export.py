@@ -4,6 +4,8 @@
 import os
 from typing import Any
 
+import requests
+
 from .memfault_service_tester import MemfaultServiceTester
 from .qemu import QEMU
 
@@ -12,21 +14,21 @@ def test_export_zip(
     qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device_id: str
 ) -> None:
     qemu.exec_cmd("memfaultctl export -o test.zip")
-    qemu.child().expect("Nothing to export right now.")
+    qemu.child().expect_exact(b"Nothing to export right now.")
 
     # add something to mar staging
     qemu.exec_cmd("memfaultctl write-attributes testdevice=true")
 
     # now data should have been exported
     qemu.exec_cmd("memfaultctl export -o test.zip")
-    qemu.child().expect("Export saved and data cleared")
+    qemu.child().expect_exact(b"Export saved and data cleared")
 
     qemu.exec_cmd("unzip -l test.zip")
-    qemu.child().expect("manifest.json")
+    qemu.child().expect_exact(b"manifest.json")
 
     # exporting again should not generate any data
     qemu.exec_cmd("memfaultctl export -o test.zip")
-    qemu.child().expect("Nothing to export right now.")
+    qemu.child().expect_exact(b"Nothing to export right now.")
 
 
 def test_export_chunk(
@@ -35,12 +37,12 @@ def test_export_chunk(
     qemu.exec_cmd("memfaultctl write-attributes export_works=true")
 
     qemu.exec_cmd("memfaultctl export -o test.bin -f chunk")
-    qemu.child().expect("Export saved and data cleared")
+    qemu.child().expect_exact(b"Export saved and data cleared")
 
     qemu.exec_cmd(
         f"curl -v -X POST https://chunks.memfault.com/api/v0/chunks/{ qemu_device_id } -H 'Memfault-Project-Key: {os.environ['MEMFAULT_PROJECT_KEY']}' -H 'Content-Type: application/octet-stream' --data-binary @test.bin"
     )
-    qemu.child().expect("Accepted")
+    qemu.child().expect_exact(b"Accepted")
 
     # Wait until we have received attributes
     def _check() -> None:
@@ -54,8 +56,10 @@ def test_export_chunk(
             if a["state"] is not None
         }
 
-        assert d["export_works"] is True
+        assert d.get("export_works") is True
 
     memfault_service_tester.poll_until_not_raising(
-        _check, timeout_seconds=5 * 60, poll_interval_seconds=1
+        _check,
+        timeout_seconds=5 * 60,
+        retry_on=(AssertionError, requests.RequestException),
     )
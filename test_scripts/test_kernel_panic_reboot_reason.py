@@ -16,12 +16,10 @@ def test_start(
     # Stream memfaultd's log
     qemu.exec_cmd("journalctl --follow --unit=memfaultd.service &")
 
-    # Sync filesystems (otherwise /media/memfault/runtime.conf would sometimes be lost!)
-    qemu.exec_cmd("sync")
-
-    qemu.exec_cmd("echo 1 > /proc/sys/kernel/panic")
-    qemu.exec_cmd("echo c > /proc/sysrq-trigger")
-    qemu.child().expect(" login:")
+    # Sync filesystems (otherwise /media/memfault/runtime.conf would sometimes be lost!),
+    # then reboot on panic and trigger a kernel panic:
+    qemu.exec_cmd("sync && echo 1 > /proc/sys/kernel/panic && echo c > /proc/sysrq-trigger")
+    qemu.child().expect_exact(b" login:")
 
     events = memfault_service_tester.poll_reboot_events_until_count(
         2, device_serial=qemu_device_id, timeout_secs=60
@@ -31,8 +29,8 @@ def test_start(
 
     qemu.child().sendline("root")
     qemu.exec_cmd("reboot")
-    qemu.child().expect("reboot: Restarting system")
-    qemu.child().expect(" login:")
+    qemu.child().expect_exact(b"reboot: Restarting system")
+    qemu.child().expect_exact(b" login:")
 
     events = memfault_service_tester.poll_reboot_events_until_count(
         3, device_serial=qemu_device_id, timeout_secs=60
@@ -5,9 +5,22 @@ import re
 import time
 import uuid
 
-from .memfault_service_tester import MemfaultServiceTester
+import requests
+
+from .memfault_service_tester import Json, MemfaultServiceTester
 from .qemu import QEMU
 
+_EXPECTED_LOG_PATTERNS = {
+    # First kernel log message
+    "kernel_first": re.escape("Booting Linux on physical CPU 0x0"),
+    # Last kernel log message
+    "kernel_last": re.escape("Run /sbin/init as init process"),
+    # First systemd message
+    "systemd_first": r"systemd .* running in system mode",
+    # Some log from memfaultd
+    "memfaultd": re.escape("Base configuration (/etc/memfaultd.conf)"),
+}
+
 
 # Assumptions:
 # - The machine/qemu is built with a valid project key of a project on app.memfault.com,
@@ -29,29 +42,28 @@ def test_logs(
     qemu.exec_cmd("memfaultctl sync")
 
     # Wait until the logfile has been uploaded to the cloud
-    def _check() -> None:
+    def _check() -> list[dict[str, Json]]:
         logs = memfault_service_tester.log_files_get_list(device_serial=qemu_device_id)
         assert len(logs) > 0
+        return logs
 
-    memfault_service_tester.poll_until_not_raising(
-        _check, timeout_seconds=60, poll_interval_seconds=1
+    logs = memfault_service_tester.poll_until_not_raising(
+        _check,
+        timeout_seconds=60,
+        retry_on=(AssertionError, requests.RequestException),
     )
 
     # Now download the log file and check the content
-    logs = memfault_service_tester.log_files_get_list(device_serial=qemu_device_id)
     cid = logs[0]["cid"]
     assert isinstance(cid, str)
     log = memfault_service_tester.log_file_download(device_serial=qemu_device_id, cid=cid)
 
-    # First kernel log message
-    assert "Booting Linux on physical CPU 0x0" in log, log
-    # Last kernel log message
-    assert "Run /sbin/init as init process" in log, log
-
-    # First systemd message
-    assert re.search(r"systemd .* running in system mode", log), log
-
-    # Some log from memfaultd
-    assert "Base configuration (/etc/memfaultd.conf)" in log, log
-    # Our test message
-    assert test_msg in log, log
+    # Look for all expected messages in a single pass over the log:
+    expected_patterns = {
+        **_EXPECTED_LOG_PATTERNS,
+        # Our test message
+        "test_message": re.escape(test_msg),
+    }
+    pattern = re.compile("|".join(f"(?P<{name}>{p})" for name, p in expected_patterns.items()))
+    found = {match.lastgroup for match in pattern.finditer(log)}
+    assert found == expected_patterns.keys(), (expected_patterns.keys() - found, log)
@@ -10,6 +10,10 @@ from .qemu import QEMU
 
 storage_max_usage_kib = 5
 
+# Labelled, so that it does not match digits in the prompt or the echoed command line, where
+# "mar_size=" is followed by "$(":
+_SIZE_PATTERN = re.compile(rb"mar_size=(\d+)\r\n")
+
 
 @pytest.fixture()
 def memfault_extra_config() -> object:
@@ -27,10 +31,10 @@ def test_mar_staging_is_cleaned_upon_log_rotation(qemu: QEMU) -> None:
     time.sleep(2)
 
     # The MAR staging area should not exceed storage_max_usage_kib:
-    qemu.exec_cmd(
-        "ls -lAR /media/memfault/mar| grep -v '^d' | awk '{total += $5} END {print total}'"
+    match = qemu.exec_cmd_and_wait(
+        "echo mar_size=$(find /media/memfault/mar -type f -exec stat -c %s {} +"
+        " | awk '{s += $1} END {print s + 0}')",
+        _SIZE_PATTERN,
+        timeout=1,
     )
-    qemu.child().expect(re.compile(rb"(\d+)"), timeout=1)
-    match = qemu.child().match
-    assert match
     assert int(match.group(1)) <= storage_max_usage_kib * 1024, match
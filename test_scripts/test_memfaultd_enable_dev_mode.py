@@ -1,47 +1,35 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
-from typing import cast
-
-import pexpect
-
 from .qemu import QEMU
 
 
 def test_start(qemu: QEMU) -> None:
     qemu.exec_cmd("memfaultctl enable-dev-mode")
-    qemu.child().expect("Enabling developer mode")
-    qemu.child().expect("https://mflt.io/developer-mode?")
+    qemu.child().expect_exact(b"Enabling developer mode")
+    qemu.child().expect_exact(b"https://mflt.io/developer-mode?")
     qemu.systemd_wait_for_service_state("memfaultctl.service", "active")
 
     qemu.exec_cmd("memfaultctl enable-dev-mode")
-    qemu.child().expect("Developer mode is already enabled")
+    qemu.child().expect_exact(b"Developer mode is already enabled")
 
     # Wait for the service to restart. If we disable immediately, there is a race condition where
     # memfaultd will try to read the config while the CLI is still writing to it.
     qemu.wait_for_memfaultd_start()
 
     qemu.exec_cmd("memfaultctl disable-dev-mode")
-    qemu.child().expect("Disabling developer mode")
+    qemu.child().expect_exact(b"Disabling developer mode")
 
     qemu.exec_cmd("memfaultctl disable-dev-mode")
-    qemu.child().expect("Developer mode is already disabled")
+    qemu.child().expect_exact(b"Developer mode is already disabled")
 
     qemu.wait_for_memfaultd_start()
 
-    # Check that the service restarted:
-    qemu.exec_cmd("journalctl -u memfaultd.service")
-    qemu.child().expect("Stopped memfaultd daemon")
-    qemu.child().expect("Starting memfaultd daemon")
-    qemu.child().expect("Starting with developer mode enabled")
-
-    # Check that the service did not fail:
-    # TODO: pexpect does not have a "not expecting" API :/
-    qemu.exec_cmd("journalctl -u memfaultd.service")
-    output = b""
-    while True:
-        try:
-            output += qemu.child().read_nonblocking(size=1024, timeout=cast(int, 0.5))
-        except pexpect.TIMEOUT:
-            break
-    assert b"memfaultd.service: Scheduled restart job" not in output
+    # Check that the service restarted and did not fail:
+    qemu.assert_memfaultd_not_restarted_on_failure(
+        (
+            b"Stopped memfaultd daemon",
+            b"Starting memfaultd daemon",
+            b"Starting with developer mode enabled",
+        )
+    )
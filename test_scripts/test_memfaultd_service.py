@@ -1,9 +1,13 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
+import re
+
 from .qemu import QEMU
 
+_USAGE_PATTERN = re.compile(rb"Usage: memfaultd ")
+
 
-def test_start(qemu: QEMU) -> None:
-    qemu.child().sendline("memfaultd --help")
-    qemu.child().expect("Usage: memfaultd ")
+def test_start(qemu_readonly: QEMU) -> None:
+    qemu_readonly.child().sendline("memfaultd --help")
+    qemu_readonly.child().expect(_USAGE_PATTERN)
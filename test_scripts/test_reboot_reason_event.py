@@ -1,9 +1,13 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
+import re
+
 from .memfault_service_tester import MemfaultServiceTester
 from .qemu import QEMU
 
+_ALREADY_TRACKED_PATTERN = re.compile(rb"boot_id already tracked [0-9a-f-]+!")
+
 # Assumptions:
 # - The machine/qemu is built with a valid project key of a project on app.memfault.com,
 #   or whatever the underlying QEMU instance points at.
@@ -15,7 +19,7 @@ def test_reboot_reason_user_reset(
     qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device_id: str
 ) -> None:
     qemu.exec_cmd("reboot")
-    qemu.child().expect("reboot: Restarting system")
+    qemu.child().expect_exact(b"reboot: Restarting system")
     qemu.login()
     qemu.exec_cmd("memfaultctl sync")
 
@@ -27,14 +31,19 @@ def test_reboot_reason_user_reset(
 
 
 def test_reboot_reason_already_tracked(qemu: QEMU) -> None:
-    # Stream memfaultd's log
-    qemu.exec_cmd("journalctl --follow --unit=memfaultd.service &")
-
     # Restart memfaultd
     qemu.exec_cmd("systemctl restart memfaultd")
 
-    # Make sure it does not double-count the last reboot
-    qemu.child().expect("boot_id already tracked")
+    # Make sure it does not double-count the last reboot. memfaultd logs this before the restart
+    # completes, but give journald a moment to store it. The loop is bounded by the guest's clock,
+    # and the timeout leaves room for slow journalctl calls under emulation:
+    qemu.exec_cmd_and_wait(
+        "deadline=$(($(date +%s) + 5)); while [ $(date +%s) -lt $deadline ]; do"
+        ' journalctl -b -u memfaultd.service -o cat | grep "boot_id already tracked" && break;'
+        " sleep 0.1; done",
+        _ALREADY_TRACKED_PATTERN,
+        timeout=30,
+    )
 
 
 def test_reboot_reason_api(
@@ -42,7 +51,7 @@ def test_reboot_reason_api(
 ) -> None:
     # Reboot with code 4 "Low Power"
     qemu.exec_cmd("memfaultctl reboot --reason 4")
-    qemu.child().expect("reboot: Restarting system")
+    qemu.child().expect_exact(b"reboot: Restarting system")
     qemu.login()
     qemu.exec_cmd("memfaultctl sync")
 
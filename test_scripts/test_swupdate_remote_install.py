@@ -18,10 +18,10 @@ def swupdate_enabled() -> bool:
 def test_start(qemu: QEMU) -> None:
     # update will install in the background. we can monitor it!
     qemu.child().sendline("journalctl -u swupdate.service -f")
-    qemu.child().expect("Installation in progress", timeout=120)
-    qemu.child().expect("SWUPDATE successful !")
-    qemu.child().expect("Update successful, executing post-update actions")
+    qemu.child().expect_exact(b"Installation in progress", timeout=120)
+    qemu.child().expect_exact(b"SWUPDATE successful !")
+    qemu.child().expect_exact(b"Update successful, executing post-update actions")
 
     # after the update installs the device will reboot
-    qemu.child().expect("reboot: Restarting system")
-    qemu.child().expect(" login:")
+    qemu.child().expect_exact(b"reboot: Restarting system")
+    qemu.child().expect_exact(b" login:")
@@ -1,10 +1,10 @@
 #
 # Copyright (c) Memfault, Inc.
 # See License.txt for details
-import time
 from typing import Any
 
 import pytest
+import requests
 
 from .memfault_service_tester import MemfaultServiceTester
 from .qemu import QEMU
@@ -16,17 +16,13 @@ from .qemu import QEMU
 # - The MEMFAULT_E2E_* environment variables are set to match whatever the underlying
 #   QEMU instance points at.
 def test(qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device_id: str) -> None:
-    # Write attributes
+    # Write attributes, then poke memfaultd to upload now. memfaultctl writes the MAR entry itself before
+    # exiting, so there is no need to wait for it:
     qemu.exec_cmd(
         'memfaultctl write-attributes a_string=running a_bool=false a_boolish_string=\\"true\\" a_float=42.42'
+        " && memfaultctl sync"
     )
 
-    # Wait for MAR to get written
-    time.sleep(5)
-
-    # Poke memfaultd to upload now
-    qemu.exec_cmd("memfaultctl sync")
-
     # Wait until we have received attributes
     def _check() -> None:
         attributes: Any = memfault_service_tester.list_attributes(device_serial=qemu_device_id)
@@ -39,17 +35,19 @@ def test(qemu: QEMU, memfault_service_tester: MemfaultServiceTester, qemu_device
             if a["state"] is not None
         }
 
-        assert d["a_string"] == "running"
-        assert d["a_bool"] is False
-        assert d["a_boolish_string"] == "true"
-        assert d["a_float"] == 42.42
+        assert d.get("a_string") == "running"
+        assert d.get("a_bool") is False
+        assert d.get("a_boolish_string") == "true"
+        assert d.get("a_float") == 42.42
 
     memfault_service_tester.poll_until_not_raising(
-        _check, timeout_seconds=2 * 60, poll_interval_seconds=1
+        _check,
+        timeout_seconds=2 * 60,
+        retry_on=(AssertionError, requests.RequestException),
     )
 
 
 @pytest.mark.parametrize("data_collection_enabled", [False])
 def test_fails_with_data_collection_disabled(qemu: QEMU, data_collection_enabled: bool) -> None:
     qemu.exec_cmd("memfaultctl write-attributes foo=bar")
-    qemu.child().expect("Cannot write attributes because data collection is disabled")
+    qemu.child().expect_exact(b"Cannot write attributes because data collection is disabled")